@@ -1,5 +1,6 @@
 import requests
 import datetime
+from concurrent.futures import ThreadPoolExecutor
 from .misc import COLORS
 
 class APOS_API:
@@ -140,24 +141,111 @@ class APOS_API:
 
         self._check_response(200, resp, auth=True)
 
-        self.user_groups = resp.json()
+        return resp.json()
 
     def get_order_infos(self, order_id):
-        resp = requests.get(f"{self.base_url}orders/{order_id}",
+        try:
+            resp = requests.get(f"{self.base_url}orders/{order_id}",
                             headers=self._get_auth())
+        except requests.exceptions.ConnectionError as e:
+            raise ConnectionException(previous=e, message="Failed to connect to API")
 
         self._check_response(200, resp, auth=True)
 
         return resp.json()
 
     def get_items_for_order(self, order_id):
-        resp = requests.get(f"{self.base_url}orders/{order_id}/items",
+        try:
+            resp = requests.get(f"{self.base_url}orders/{order_id}/items",
                             headers=self._get_auth())
+        except requests.exceptions.ConnectionError as e:
+            raise ConnectionException(previous=e, message="Failed to connect to API")
 
         self._check_response(200, resp, auth=True)
 
         return resp.json()
 
+    def set_orders_arrived(self, arrival_times, max_workers=4):
+        """
+        Marks many orders as arrived. 'arrival_times' maps order ids to the datetime of their arrival.
+        Successfully patched orders are updated in the cached user groups.
+        Returns a tuple of dicts (updated orders, failures) both keyed by order id.
+        """
+        updated, failures = self._run_batch(
+            lambda order_id: self.set_order_arrived(order_id, arrival_times[order_id]),
+            arrival_times.keys(),
+            max_workers)
+
+        self.user_groups = [updated.get(order['id'], order) for order in self.user_groups]
+
+        return updated, failures
+
+    def get_items_for_orders(self, order_ids, max_workers=4):
+        """
+        Fetches the items of many orders.
+        Returns a tuple of dicts (items, failures) both keyed by order id.
+        """
+        return self._run_batch(self.get_items_for_order, order_ids, max_workers)
+
+    def get_expired_group_orders(self, now=None, grace=60, past=2):
+        """
+        Returns the cached user groups whose deadline passed more than 'grace' minutes
+        but less than 'past' days ago without an arrival.
+        Call 'pull_user_groups' first to refresh the cache.
+        """
+        if not now:
+            now = datetime.datetime.now()
+
+        expired_orders = []
+        for order in self.user_groups:
+            deadline = datetime.datetime.fromtimestamp(int(order['deadline']))
+            if 'arrival' not in order.keys() \
+                    and deadline < now - datetime.timedelta(minutes=grace) \
+                    and (now - deadline).days < past:
+                expired_orders.append(order)
+
+        return expired_orders
+
+    def summarise_expired_group_orders(self, expired_orders, max_workers=4):
+        """
+        Fetches the items of the given expired user groups, see 'get_expired_group_orders'.
+        Returns a tuple of dicts (items, failures) both keyed by order id.
+        """
+        return self.get_items_for_orders([order['id'] for order in expired_orders], max_workers)
+
+    def close_expired_group_orders(self, expired_orders, arrival_time=None, max_workers=4):
+        """
+        Closes the given expired user groups, see 'get_expired_group_orders', by marking them as arrived.
+        Returns a tuple of dicts (updated orders, failures) both keyed by order id.
+        """
+        if not arrival_time:
+            arrival_time = datetime.datetime.now()
+
+        arrival_times = {order['id']: arrival_time for order in expired_orders}
+
+        return self.set_orders_arrived(arrival_times, max_workers=max_workers)
+
+    def _run_batch(self, func, order_ids, max_workers):
+        results = {}
+        failures = {}
+
+        order_ids = list(order_ids)
+        if not order_ids:
+            return results, failures
+
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(order_ids)))) as executor:
+            futures = {order_id: executor.submit(func, order_id) for order_id in order_ids}
+
+            for order_id, future in futures.items():
+                try:
+                    results[order_id] = future.result()
+                except APIException as e:
+                    failures[order_id] = e
+                except Exception as e:
+                    failures[order_id] = GeneralAPIException(previous=e, message=f"Unexpected error: {e!r}")
+
+        return results, failures
+
     def _check_response(self, expected_http_code, response, auth=False):
         if response.status_code == expected_http_code:
             return
@@ -23,14 +23,43 @@ class APOS:
         parser_show = subparsers.add_parser("show", help="Show the items you ordered or the groups you created")
 
         parser_arrived = subparsers.add_parser("arrived", help="Flag a order as arrived")
+        parser_arrived.add_argument("--batch", action="store_true", help="Flag multiple orders as arrived at once")
+        parser_arrived.add_argument("--workers", type=int, default=4, help="Maximum number of parallel requests in batch mode")
+
+        parser_expired = subparsers.add_parser("expired", help="Summarise or close all your group orders whose deadline passed without arrival")
+        parser_expired.add_argument("--grace", type=int, default=60, help="Minutes after the deadline before a group order counts as expired")
+        parser_expired.add_argument("--past", type=int, default=2, help="Only consider group orders whose deadline is less than this many days ago")
+        parser_expired.add_argument("--close", action="store_true", help="Flag all expired group orders as arrived")
+        parser_expired.add_argument("--workers", type=int, default=4, help="Maximum number of parallel requests")
 
         parser_info = subparsers.add_parser("info", help="Get all infos to order at the delivery service")
 
+        parser_loadtest = subparsers.add_parser("loadtest", help="Generate synthetic traffic to test the capacity of a backend")
+        parser_loadtest.add_argument("--base-url", help="Backend under test, a local stand-in server is started if omitted. "
+                                     "The accounts loadtest-user-0 ... loadtest-user-N with --password must already exist there, "
+                                     "otherwise every virtual user fails to login")
+        parser_loadtest.add_argument("--users", type=int, default=50, help="Maximum number of concurrent virtual users")
+        parser_loadtest.add_argument("--rate", type=float, default=10.0, help="Arrival rate of new virtual users per second")
+        parser_loadtest.add_argument("--duration", type=float, default=30.0, help="Duration of the arrival phase in seconds")
+        parser_loadtest.add_argument("--poll-interval", type=float, default=1.0, help="Seconds between two polls of the active group orders")
+        parser_loadtest.add_argument("--create-group", type=float, default=0.1, help="Probability that a virtual user creates a group order")
+        parser_loadtest.add_argument("--deadline", type=float, default=10.0, help="Seconds until the deadline of created group orders")
+        parser_loadtest.add_argument("--burst", type=int, default=3, help="Number of items each virtual user orders near the deadline")
+        parser_loadtest.add_argument("--password", default="loadtest", help="Password of the virtual users")
+        parser_loadtest.add_argument("--seed", type=int, help="Seed for reproducible traffic")
+
         parser_login = subparsers.add_parser("login",
                                             help="Login to your account and create a token for authentication, do this first!")
 
         args = parser.parse_args()
 
+        if args.command == "loadtest":
+            for option in ["users", "rate", "duration", "poll_interval", "deadline", "burst"]:
+                if getattr(args, option) <= 0:
+                    parser.error(f"--{option.replace('_', '-')} must be positive")
+            if not 0 <= args.create_group <= 1:
+                parser.error("--create-group must be a probability between 0 and 1")
+
         self.default_base_url = "http://localhost:5000/api/v1/"
 
         config_dir = os.getenv("XDG_CONFIG_HOME", os.path.expanduser("~/.config"))
@@ -58,6 +87,10 @@ class APOS:
 
 
     def decisions(self, args):
+        if args.command == "loadtest":
+            self.start_loadtest(args)
+            return
+
         if args.command == "login":
             self.login()
 
@@ -70,7 +103,13 @@ class APOS:
             self.start_show()
 
         if args.command == "arrived":
-            self.start_arrived()
+            if args.batch:
+                self.start_arrived_batch(args.workers)
+            else:
+                self.start_arrived()
+
+        if args.command == "expired":
+            self.start_expired(args.close, args.workers, args.grace, args.past)
 
         if args.command == "info":
             self.start_info()
@@ -194,7 +233,7 @@ class APOS:
     def start_arrived(self):
         print("Mark a pizza group order as arrived! \n")
 
-        _, id_list = self.show_user_groups(not_arrived=True, show_arrival=False)
+        id_list = self.show_user_groups(not_arrived=True, show_arrival=False)
 
         while True:
             user_input = input(f"Enter the group order which arrived: (0-{len(id_list) - 1}) ")
@@ -206,6 +245,130 @@ class APOS:
             else:
                 print(f"{COLORS.FAIL}Invalid user input!{COLORS.ENDC}")
 
+    def start_arrived_batch(self, workers=4):
+        print("Mark multiple pizza group orders as arrived! \n")
+
+        id_list = self.show_user_groups(not_arrived=True, show_arrival=False)
+
+        if len(id_list) == 0:
+            print("No group order avalabile.\n")
+            return
+
+        while True:
+            user_input = input(f"Enter the group orders which arrived separated by commas: (0-{len(id_list) - 1}) ")
+            selection = [entry.strip() for entry in user_input.split(",")]
+
+            if all(entry.isdigit() and 0 <= int(entry) < len(id_list) for entry in selection):
+                break
+            else:
+                print(f"{COLORS.FAIL}Invalid user input!{COLORS.ENDC}")
+
+        arrival_times = {}
+        for entry in dict.fromkeys(selection):
+            minutes = parse_input(f"How many minutes ago did group {entry} arrive? (empty for now)  ", r"^\d*$")
+            arrival_times[id_list[int(entry)]] = datetime.now() - timedelta(minutes=int(minutes or 0))
+
+        updated, failures = self.api.set_orders_arrived(arrival_times, max_workers=workers)
+
+        self.print_batch_result(updated, failures)
+
+    def start_expired(self, close=False, workers=4, grace=60, past=2):
+        print(f"Summary of your group orders whose deadline passed more than {grace} minutes ago without arrival (past {past} days)! \n")
+
+        self.api.pull_user_groups()
+
+        expired_orders = self.api.get_expired_group_orders(grace=grace, past=past)
+
+        if len(expired_orders) == 0:
+            print("No expired group order avalabile.\n")
+            return
+
+        items, failures = self.api.summarise_expired_group_orders(expired_orders, max_workers=workers)
+
+        #Format
+        fromated_orders = []
+        for order in expired_orders:
+            order_formated = {
+                'title': order['title'],
+                'deliverer': order['deliverer'],
+                'deadline': datetime.fromtimestamp(int(order['deadline'])),
+                }
+
+            if order['id'] in items:
+                price, tip = self.sum_items(items[order['id']])
+                order_formated['items'] = len(items[order['id']])
+                order_formated['price'] = int_eurocent_to_euro_string(price)
+                order_formated['tip'] = int_eurocent_to_euro_string(tip)
+            else:
+                order_formated['items'] = "Unknown"
+                order_formated['price'] = "Unknown"
+                order_formated['tip'] = "Unknown"
+
+            fromated_orders.append(order_formated)
+
+        header_bar = {
+            'title': "Title",
+            'deliverer': "Deliverer",
+            'deadline': "Deadline",
+            'items': "Items",
+            'price': "Price",
+            'tip': "Tip"}
+
+        # Show result
+        print(tabulate(fromated_orders, headers=header_bar, tablefmt="simple", showindex="always"))
+
+        if failures:
+            print_error(f"\nFailed to fetch the items of {len(failures)} group order(s)!")
+
+        if close:
+            if input("\nFlag all expired group orders as arrived? (y/n)  ") == "y":
+                updated, failures = self.api.close_expired_group_orders(expired_orders, max_workers=workers)
+                self.print_batch_result(updated, failures)
+            else:
+                print("Abort")
+
+    def print_batch_result(self, updated, failures):
+        print(f"\n{COLORS.OKBLUE}{len(updated)} group order(s) updated successfully!{COLORS.ENDC}")
+
+        if failures:
+            print_error(f"{len(failures)} group order(s) failed:")
+            for order_id, error in failures.items():
+                print(f"  {order_id}: {getattr(error, 'message', type(error).__name__)}")
+            exit(1)
+
+    def start_loadtest(self, args):
+        from .loadtest import LoadTest, StandInServer, print_report
+
+        server = None
+        base_url = args.base_url
+
+        if not base_url:
+            server = StandInServer()
+            server.start()
+            base_url = server.get_base_url()
+            print(f"Started local stand-in server at {base_url}")
+
+        print(f"Load testing {base_url} with up to {args.users} virtual users arriving at {args.rate}/s for {args.duration} s\n")
+
+        load_test = LoadTest(base_url,
+                             users=args.users,
+                             arrival_rate=args.rate,
+                             duration=args.duration,
+                             poll_interval=args.poll_interval,
+                             create_group_probability=args.create_group,
+                             deadline_seconds=args.deadline,
+                             burst_size=args.burst,
+                             password=args.password,
+                             seed=args.seed)
+
+        try:
+            load_test.run()
+        finally:
+            if server:
+                server.stop()
+
+        print_report(load_test)
+
     def create_group_order(self):
         print("\nYou are creating a group order. Other people can add their items to your group order. Please check if there are \n")
         order = {}
@@ -372,26 +535,12 @@ class APOS:
             #Format
             fromated_items = []
 
-            price = 0
-            tip = 0
+            price, tip = self.sum_items(items)
 
             for item in items:
-
-                if item['price'] is None:
-                    item['price'] = 0
-                price += item['price']
-
-                item_tip = 0
-                if item['tip_absolute']:
-                    item_tip = item['tip_absolute']
-                elif item['tip_percent']:
-                    item_tip = int(float(item['tip_percent']) / 100.0 * item['price'])
-
-                tip += item_tip
-
                 item_formated = {
                     'name': item['name'],
-                    'tip': int_eurocent_to_euro_string(item_tip),
+                    'tip': int_eurocent_to_euro_string(self.get_item_tip(item)),
                     'price': int_eurocent_to_euro_string(item['price']),
                     }
 
@@ -410,6 +559,23 @@ class APOS:
             print(f"{'-'*35}\n{COLORS.OKBLUE}{COLORS.BOLD}Total without tip: {int_eurocent_to_euro_string(price)}")
             print(f"Total tip: {int_eurocent_to_euro_string(tip)}\n{COLORS.ENDC}")
 
+    def get_item_tip(self, item):
+        if item['tip_absolute']:
+            return item['tip_absolute']
+        elif item['tip_percent']:
+            return int(float(item['tip_percent']) / 100.0 * (item['price'] or 0))
+        return 0
+
+    def sum_items(self, items):
+        price = 0
+        tip = 0
+
+        for item in items:
+            price += item['price'] or 0
+            tip += self.get_item_tip(item)
+
+        return price, tip
+
 
 def run():
     """
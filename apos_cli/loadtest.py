@@ -0,0 +1,426 @@
+import re
+import json
+import time
+import random
+import threading
+import datetime
+from urllib.parse import parse_qs
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from concurrent.futures import ThreadPoolExecutor, wait
+from tabulate import tabulate
+from .misc import COLORS
+from .api import APOS_API
+
+
+class StandInHTTPServer(ThreadingHTTPServer):
+    # A larger backlog keeps the stand-in from dropping connections during bursts
+    request_queue_size = 128
+    daemon_threads = True
+
+
+class StandInServer:
+    """
+    Minimal in-memory APOS backend used as a local target for load tests.
+    Stored orders and items are never mutated, updates replace them,
+    so responses can be serialized after releasing the lock.
+    """
+    def __init__(self, host="127.0.0.1", port=0):
+        self.lock = threading.Lock()
+        self.orders = {}
+        self.items = {}
+        self.next_id = 1
+
+        server = self
+
+        class Handler(StandInRequestHandler):
+            state = server
+
+        self.httpd = StandInHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    def get_base_url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}/api/v1/"
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def new_id(self):
+        with self.lock:
+            new_id = self.next_id
+            self.next_id += 1
+        return new_id
+
+
+class StandInRequestHandler(BaseHTTPRequestHandler):
+    state = None
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        if self._route() != ["auth"]:
+            return self._send(404)
+
+        length = int(self.headers.get("Content-Length", 0))
+        data = parse_qs(self.rfile.read(length).decode())
+
+        if not data.get("username"):
+            return self._send(401)
+
+        self._send(200, {"token": data["username"][0]})
+
+    def do_GET(self):
+        user = self._get_user()
+        if user is None:
+            return self._send(401)
+
+        route = self._route()
+        now = time.time()
+
+        code, body = 404, None
+        with self.state.lock:
+            if route == ["orders"]:
+                code, body = 200, list(self.state.orders.values())
+            elif route == ["orders", "active"]:
+                code, body = 200, [order for order in self.state.orders.values() if order['deadline'] > now]
+            elif route == ["user", "orders"]:
+                code, body = 200, [order for order in self.state.orders.values() if order['owner']['username'] == user]
+            elif route == ["user", "items"]:
+                code, body = 200, [self._with_order(item) for item in self.state.items.values() if item['user']['username'] == user]
+            elif len(route) == 2 and route[0] == "orders" and int(route[1]) in self.state.orders:
+                code, body = 200, self.state.orders[int(route[1])]
+            elif len(route) == 3 and route[0] == "orders" and route[2] == "items":
+                code, body = 200, [self._with_order(item) for item in self.state.items.values() if item['order']['id'] == int(route[1])]
+
+        self._send(code, body)
+
+    def do_PUT(self):
+        user = self._get_user()
+        if user is None:
+            return self._send(401)
+
+        route = self._route()
+        data = self._read_json()
+
+        if route == ["orders"]:
+            order = dict(data, id=self.state.new_id(), owner={"username": user})
+            with self.state.lock:
+                self.state.orders[order['id']] = order
+            return self._send(201, order)
+
+        if len(route) == 3 and route[0] == "orders" and route[2] == "items":
+            with self.state.lock:
+                order = self.state.orders.get(int(route[1]))
+            if order is None:
+                return self._send(404)
+            item = dict(data, id=self.state.new_id(), order=order, user={"username": user})
+            with self.state.lock:
+                self.state.items[item['id']] = item
+            return self._send(201, item)
+
+        self._send(404)
+
+    def do_PATCH(self):
+        user = self._get_user()
+        if user is None:
+            return self._send(401)
+
+        route = self._route()
+        data = self._read_json()
+
+        code, body = 404, None
+        with self.state.lock:
+            if len(route) == 2 and route[0] == "orders" and int(route[1]) in self.state.orders:
+                order = self.state.orders[int(route[1])]
+                if order['owner']['username'] != user:
+                    code = 403
+                else:
+                    order = dict(order, **data)
+                    self.state.orders[order['id']] = order
+                    code, body = 200, order
+
+        self._send(code, body)
+
+    def _with_order(self, item):
+        # Embed the current version of the order, it may have been replaced since the item was created
+        return dict(item, order=self.state.orders[item['order']['id']])
+
+    def _route(self):
+        path = self.path.split("?")[0]
+        path = re.sub(r"^/api/v1/", "", path)
+        route = [part for part in path.split("/") if part]
+        if len(route) >= 2 and route[0] == "orders" and not route[1].isdigit() and route != ["orders", "active"]:
+            return []
+        return route
+
+    def _get_user(self):
+        auth = self.headers.get("Authorization", "")
+        if not auth.startswith("Bearer ") or not auth[len("Bearer "):]:
+            return None
+        return auth[len("Bearer "):]
+
+    def _read_json(self):
+        length = int(self.headers.get("Content-Length", 0))
+        if length == 0:
+            return {}
+        return json.loads(self.rfile.read(length))
+
+    def _send(self, code, body=None):
+        payload = json.dumps(body).encode() if body is not None else b""
+        self.send_response(code)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class LoadStats:
+    """
+    Thread safe collection of request latencies and errors per operation.
+    """
+    BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000]
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.latencies = {}
+        self.errors = {}
+        self.started = None
+        self.stopped = None
+
+    def record(self, operation, latency, error=None):
+        with self.lock:
+            self.latencies.setdefault(operation, []).append(latency)
+            if error is not None:
+                self.errors.setdefault(operation, []).append(error)
+
+    def timed(self, operation, func, *args, **kwargs):
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except Exception as e:
+            self.record(operation, time.perf_counter() - start, e)
+            raise
+        self.record(operation, time.perf_counter() - start)
+        return result
+
+    def get_duration(self):
+        return max((self.stopped or time.perf_counter()) - self.started, 1e-9)
+
+    def summary(self):
+        rows = []
+        all_latencies = []
+        all_errors = 0
+        for operation in sorted(self.latencies.keys()):
+            latencies = self.latencies[operation]
+            errors = len(self.errors.get(operation, []))
+            all_latencies += latencies
+            all_errors += errors
+            rows.append(self._summary_row(operation, latencies, errors))
+        if all_latencies:
+            rows.append(self._summary_row("total", all_latencies, all_errors))
+        return rows
+
+    def histogram(self):
+        latencies = sorted(latency * 1000 for values in self.latencies.values() for latency in values)
+        rows = []
+        lower = 0
+        for upper in self.BUCKETS_MS + [float("inf")]:
+            count = len([latency for latency in latencies if lower <= latency < upper])
+            label = f"{lower}-{upper} ms" if upper != float("inf") else f">= {lower} ms"
+            rows.append({'bucket': label, 'count': count, 'bar': "#" * int(50 * count / max(len(latencies), 1))})
+            lower = upper
+        return rows
+
+    def _summary_row(self, operation, latencies, errors):
+        latencies = sorted(latencies)
+        return {
+            'operation': operation,
+            'requests': len(latencies),
+            'errors': errors,
+            'error_rate': f"{100.0 * errors / len(latencies):.1f} %",
+            'throughput': f"{len(latencies) / self.get_duration():.1f}/s",
+            'p50': f"{self._percentile(latencies, 50) * 1000:.1f} ms",
+            'p95': f"{self._percentile(latencies, 95) * 1000:.1f} ms",
+            'p99': f"{self._percentile(latencies, 99) * 1000:.1f} ms",
+            'max': f"{latencies[-1] * 1000:.1f} ms",
+            }
+
+    @staticmethod
+    def _percentile(sorted_values, percent):
+        index = min(len(sorted_values) - 1, int(round(percent / 100.0 * (len(sorted_values) - 1))))
+        return sorted_values[index]
+
+
+class LoadTest:
+    """
+    Drives noon spike like traffic through APOS_API.
+
+    Virtual users arrive as a poisson process with 'arrival_rate' users per second for 'duration' seconds.
+    At most 'users' virtual users are active at the same time.
+    Every virtual user logs in, polls the active group orders, creates a group order with
+    probability 'create_group_probability' and sends a burst of items to a group order close to its deadline.
+    """
+    def __init__(self, base_url, users=50, arrival_rate=10.0, duration=30.0, poll_interval=1.0,
+                 create_group_probability=0.1, deadline_seconds=10.0, burst_window=3.0, burst_size=3,
+                 user_prefix="loadtest-user-", password="loadtest", seed=None):
+        self.base_url = base_url
+        self.users = users
+        self.arrival_rate = arrival_rate
+        self.duration = duration
+        self.poll_interval = poll_interval
+        self.create_group_probability = create_group_probability
+        self.deadline_seconds = deadline_seconds
+        self.burst_window = burst_window
+        self.burst_size = burst_size
+        self.user_prefix = user_prefix
+        self.password = password
+        self.seed = seed
+
+        self.stats = LoadStats()
+        self.lock = threading.Lock()
+        self.stopping = threading.Event()
+        self.running_users = 0
+        self.failed_users = 0
+        self.delayed_arrivals = 0
+        self.dropped_arrivals = 0
+        self.interrupted = False
+
+    def run(self):
+        """
+        Runs the load test until all virtual users finished.
+        On KeyboardInterrupt waiting virtual users are dropped and running ones stop as soon as possible.
+        """
+        self.stats.started = time.perf_counter()
+        end = self.stats.started + self.duration
+
+        # Arrivals get their own generator, so worker threads can not shift the schedule
+        arrival_random = random.Random(self.seed)
+
+        executor = ThreadPoolExecutor(max_workers=self.users)
+        futures = []
+        try:
+            user_number = 0
+            next_arrival = self.stats.started
+            while True:
+                next_arrival += arrival_random.expovariate(self.arrival_rate)
+                if next_arrival >= end:
+                    break
+                time.sleep(max(0, next_arrival - time.perf_counter()))
+
+                with self.lock:
+                    # All workers are busy, the virtual user has to wait for a free one
+                    if self.running_users >= self.users:
+                        self.delayed_arrivals += 1
+                    self.running_users += 1
+
+                future = executor.submit(self._virtual_user, user_number)
+                future.add_done_callback(self._user_done)
+                futures.append(future)
+                user_number += 1
+
+            wait(futures)
+        except KeyboardInterrupt:
+            self.interrupted = True
+            self.stopping.set()
+            for future in futures:
+                if future.cancel():
+                    self.dropped_arrivals += 1
+        finally:
+            executor.shutdown(wait=True)
+
+        self.stats.stopped = time.perf_counter()
+        return self.stats
+
+    def _user_done(self, future):
+        with self.lock:
+            self.running_users -= 1
+
+    def _virtual_user(self, user_number):
+        if self.stopping.is_set():
+            return
+
+        if self.seed is None:
+            user_random = random.Random()
+        else:
+            user_random = random.Random(f"{self.seed}-{user_number}")
+
+        api = APOS_API(self.base_url)
+        try:
+            self.stats.timed("login", api.login, f"{self.user_prefix}{user_number}", self.password)
+
+            if user_random.random() < self.create_group_probability:
+                deadline = datetime.datetime.now() + datetime.timedelta(seconds=self.deadline_seconds)
+                self.stats.timed("create_group_order", api.create_group_order,
+                                 f"Load test group {user_number}", "Synthetic group order",
+                                 deadline.timestamp(), "Building", "Pizza Service")
+
+            order_id = self._wait_for_deadline(api)
+            if order_id is None:
+                return
+
+            for i in range(self.burst_size):
+                if self.stopping.is_set():
+                    return
+                self.stats.timed("create_item", api.create_item, order_id, f"Pizza {i}",
+                                 user_random.randint(500, 1500), tip_absolute=100)
+        except Exception:
+            with self.lock:
+                self.failed_users += 1
+
+    def _wait_for_deadline(self, api):
+        """
+        Polls the active group orders of load test users until one of them is within the burst window of its deadline.
+        """
+        give_up = time.time() + self.deadline_seconds + self.poll_interval
+        while time.time() < give_up and not self.stopping.is_set():
+            self.stats.timed("orders/active", api.pull_active_group_orders)
+
+            now = time.time()
+            orders = [order for order in api.get_active_group_orders()
+                      if order['owner']['username'].startswith(self.user_prefix) and float(order['deadline']) > now]
+            if orders:
+                order = min(orders, key=lambda order: float(order['deadline']))
+                remaining = float(order['deadline']) - now
+                if remaining <= self.burst_window:
+                    return order['id']
+                self.stopping.wait(min(self.poll_interval, remaining - self.burst_window))
+            else:
+                self.stopping.wait(self.poll_interval)
+        return None
+
+
+def print_report(load_test):
+    stats = load_test.stats
+
+    print(f"\n{COLORS.HEADER}{COLORS.BOLD}LOAD TEST SUMMARY ({stats.get_duration():.1f} s){COLORS.ENDC}\n")
+
+    header_bar = {
+        'operation': "Operation",
+        'requests': "Requests",
+        'errors': "Errors",
+        'error_rate': "Error rate",
+        'throughput': "Throughput",
+        'p50': "p50",
+        'p95': "p95",
+        'p99': "p99",
+        'max': "Max"}
+
+    print(tabulate(stats.summary(), headers=header_bar, tablefmt="simple"))
+
+    print(f"\n{COLORS.HEADER}{COLORS.BOLD}LATENCY HISTOGRAM{COLORS.ENDC}\n")
+    print(tabulate(stats.histogram(), headers={'bucket': "Latency", 'count': "Count", 'bar': ""}, tablefmt="simple"))
+
+    if load_test.interrupted:
+        print(f"\n{COLORS.WARNING}Load test interrupted, results are partial.{COLORS.ENDC}")
+    if load_test.failed_users:
+        print(f"\n{COLORS.WARNING}{load_test.failed_users} virtual user(s) aborted after an error.{COLORS.ENDC}")
+    if load_test.delayed_arrivals:
+        print(f"\n{COLORS.WARNING}{load_test.delayed_arrivals} virtual user(s) waited for a free slot, "
+              f"the arrival rate was not reached. Increase --users.{COLORS.ENDC}")
+    if load_test.dropped_arrivals:
+        print(f"\n{COLORS.WARNING}{load_test.dropped_arrivals} waiting virtual user(s) were dropped.{COLORS.ENDC}")